@@ -1,26 +1,39 @@
 #!/usr/bin/env python3
 import json
+import mmap
 import os
 import re
 import subprocess
 import sys
-from collections import defaultdict
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator, Optional, TextIO
+from urllib.parse import urlsplit
 
 INTERVAL = 15  # Minutes between work log entries
 WORKLOG = "~/.worklog"
 WORKLOG = Path(WORKLOG).expanduser()
 if not WORKLOG.exists():
     WORKLOG.touch()
-TIME_REGEX = re.compile(r"^\d{8}-\d{4} ")
-GIT_REGEX = re.compile(r"\[.*]$")
-HTTP_REGEX = re.compile(r"https?://")
-CREDS_REGEX = re.compile(r"[^/]*@")
-ORIGIN_REGEX = re.compile(r"Your branch .*'(.+)'")
+# Remote URLs keyed by .git/config path and mtime, saves a git call per prompt
+GITCACHE = WORKLOG.with_name(".worklog.gitcache")
+# Every tag used so far, one per line, so `lw t` needn't read the whole log
+TAGSFILE = WORKLOG.with_name(".worklog.tags")
+# Timestamp fields as groups, so no separate strptime() / slicing is needed
+LINE_REGEX = re.compile(r"^(\d{4})(\d{2})(\d{2})-(\d{2})(\d{2}) ")
+# For .match(buffer, pos) on raw log bytes, no ^ as it wouldn't match at pos
+TIME_REGEX_B = re.compile(rb"\d{8}-\d{4} ")
+# Start of each timestamp line in the whole log text
+ENTRY_REGEX = re.compile(r"^\d{8}-\d{4} ", re.MULTILINE)
+# git output is parsed, not shown, so skip locale setup in git
+GIT_ENV = {**os.environ, "LC_ALL": "C"}
+# XY status codes from `git status --porcelain=v2` to GitInfo.flags characters
+GIT_FLAGS = {"M": "!", "A": "+", "R": ">", "D": "x"}
 # FIXME: git clone --depth 1 causes git to ignore other branches, so git status
-# doesn't report "Your branch ..." info.
+# doesn't report branch.upstream info.
 # see https://stackoverflow.com/a/27393574/1072212
 RED = "\033[31m"
 YELLOW = "\033[33m"
@@ -29,6 +42,8 @@ DEFAULT = "\033[0m"
 # so vim doesn't overwrite terminal contents, `altscreen on` in .screenrc might work too
 SCREEN = "screen" if os.environ.get("STY") else ""
 # H history command in logwork.sh because that's where the shell history is available
+# read_only commands only read the log, so they run without updating it first, and
+# without the cost of git_info()
 COMMANDS = {
     "e": {
         "name": "Edit",
@@ -49,7 +64,8 @@ COMMANDS = {
     },
     "SHOW_TAIL": {  # odd name so `lw tail recursion not working` stores text comment
         "name": "Tail",
-        "command": f"tail -25 {WORKLOG}",
+        "function": "show_tail",
+        "read_only": True,
     },
     "PS1": {
         "name": "Prompt",
@@ -57,14 +73,17 @@ COMMANDS = {
     "j": {  # command letter subject to change
         "name": "JSON",
         "function": "lw_json",
+        "read_only": True,
     },
     "h": {
         "name": "History",
         "function": "lw_history",
+        "read_only": True,
     },
     "P": {
         "name": "Percent",
         "function": "lw_percent",
+        "read_only": True,
     },
 }
 
@@ -97,102 +116,228 @@ class WorkState:
 
 
 def git_info() -> str:
-    status = subprocess.run(
-        "git status", shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    # Start both git calls before waiting on either, so they run concurrently.  The
+    # remote listing is only needed, and only started, on a cache miss in a repo
+    cache_key, remotes = cached_remotes()
+    status = subprocess.Popen(
+        ["git", "status", "--porcelain=v2", "--branch", "-z"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=GIT_ENV,
     )
-    status = status.stdout.decode("utf8") + "\n" + status.stderr.decode("utf8")
-    if "fatal: " in status:
-        return GitInfo()
-    flags = []
-    if "modified:" in status:
-        flags.append("!")
-    if "Untracked files" in status:
-        flags.append("?")
-    if "Your branch is ahead of" in status:
-        flags.append("*")
-    if "new file:" in status:
-        flags.append("+")
-    if "renamed:" in status:
-        flags.append(">")
-    if "deleted:" in status:
-        flags.append("x")
-    if flags:
-        flags = " " + "".join(flags).strip()
-    else:
-        flags = ""
-
-    status = status.splitlines()
-    branch = status[0].split()[-1]
-    origin = next((i for i in status if i.startswith("Your branch")), "")
-    origin = ORIGIN_REGEX.search(origin).group(1) if origin else ""
-    if origin:
-        origin = origin.split()[-1].strip("'.").split("/")[0]
-    if origin:
-        origin = subprocess.run(
-            "git remote get-url " + origin,
-            shell=True,
+    listing = None
+    if cache_key and remotes is None:
+        listing = subprocess.Popen(
+            ["git", "remote", "-v"],
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=GIT_ENV,
         )
-        origin = origin.stdout.decode("utf8").strip()
-        if HTTP_REGEX.search(origin):
-            # Remove the username and password from the URL
-            origin = CREDS_REGEX.sub("", origin)
-        origin = origin.replace("git@", "")
-        origin = HTTP_REGEX.sub("", origin)
-    commit = subprocess.run(
-        "git rev-parse --short HEAD",
-        shell=True,
+    output = status.communicate()[0]
+    if listing and cache_key:
+        remotes = remote_urls(listing.communicate()[0].decode("utf8", "replace"))
+        cache_remotes(cache_key, remotes)
+    if status.returncode:
+        return GitInfo()
+    branch, commit, upstream, flags = parse_status(output.decode("utf8", "replace"))
+    remote = upstream.split("/")[0]
+    if remotes is not None:
+        origin = remotes.get(remote, "")
+    elif remote:  # worktree / submodule, not cached, look up only the one needed
+        origin = remote_url(remote)
+    else:
+        origin = ""
+    return GitInfo(branch=branch, commit=commit, origin=origin, flags=flags)
+
+
+def parse_status(output: str) -> tuple[str, str, str, str]:
+    """Return (branch, commit, upstream, flags) from git status --porcelain=v2 -z."""
+    branch = commit = upstream = ""
+    found = set()
+    records = iter(output.split("\0"))
+    for record in records:
+        if record.startswith("# branch.oid "):
+            commit = record[13:20] if not record.endswith("(initial)") else ""
+        elif record.startswith("# branch.head "):
+            branch = record[14:]
+        elif record.startswith("# branch.upstream "):
+            upstream = record[18:]
+        elif record.startswith("# branch.ab "):
+            if record.split()[2] != "+0":
+                found.add("*")
+        elif record.startswith("? "):
+            found.add("?")
+        elif record.startswith("u "):
+            found.add("!")  # unmerged, i.e. a merge conflict
+        elif record.startswith(("1 ", "2 ")):
+            found.update(GIT_FLAGS.get(code, "") for code in record[2:4])
+            if record[0] == "2":
+                # -z puts a rename's original path in its own record
+                next(records, None)
+    if branch == "(detached)":
+        branch = commit  # as plain `git status` reports "HEAD detached at <commit>"
+    flags = "".join(flag for flag in "!?*+>x" if flag in found)
+    if flags:
+        flags = " " + flags
+    return branch, commit, upstream, flags
+
+
+def git_config() -> Optional[Path]:
+    """Return the .git/config of the repo containing the cwd, or None."""
+    cwd = Path.cwd()
+    for folder in (cwd, *cwd.parents):
+        git_dir = folder / ".git"
+        if git_dir.is_dir():
+            return git_dir / "config"
+        if git_dir.exists():
+            return None  # worktree / submodule .git file, don't bother caching
+    return None
+
+
+def remote_url(remote: str) -> str:
+    """Return the URL for remote, without credentials."""
+    origin = subprocess.run(
+        ["git", "remote", "get-url", remote],
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=GIT_ENV,
     )
-    # Get remote url
-    commit = commit.stdout.decode("utf8").strip()
-    return GitInfo(branch=branch, commit=commit, origin=origin, flags=flags)
+    return clean_url(origin.stdout.decode("utf8", "replace").strip())
+
+
+def remote_urls(listing: str) -> dict[str, str]:
+    """Return {remote: URL without credentials} from `git remote -v` output."""
+    remotes = {}
+    for line in listing.splitlines():
+        if not line.endswith(" (fetch)"):
+            continue
+        remote, origin = line[: -len(" (fetch)")].split("\t", 1)
+        remotes[remote] = clean_url(origin)
+    return remotes
+
+
+def clean_url(origin: str) -> str:
+    """Return origin without scheme or credentials, e.g. github.com/user/repo.git"""
+    parts = urlsplit(origin)
+    if parts.scheme in ("http", "https"):
+        # Drop the username and password
+        return parts.netloc.rpartition("@")[2] + parts.path
+    return origin.replace("git@", "")
+
+
+def cached_remotes() -> tuple[Optional[str], Optional[dict[str, str]]]:
+    """Return (cache key, remotes dict or None if not cached) for the cwd's repo."""
+    config = git_config()
+    if not config or not config.exists():
+        return None, None
+    key = f"{config}|{config.stat().st_mtime_ns}"
+    try:
+        return key, json.loads(GITCACHE.read_text()).get(key)
+    except (OSError, ValueError):
+        return key, None
+
+
+def cache_remotes(key: str, remotes: dict[str, str]) -> None:
+    """Store remotes under key in GITCACHE, replacing older keys for the same repo."""
+    try:
+        cache = json.loads(GITCACHE.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    config = key.rsplit("|", 1)[0]
+    cache = {k: v for k, v in cache.items() if not k.startswith(f"{config}|")}
+    cache[key] = remotes
+    tmp = GITCACHE.with_name(f"{GITCACHE.name}.{os.getpid()}")
+    try:
+        tmp.write_text(json.dumps(cache))
+        os.replace(tmp, GITCACHE)
+    except OSError:
+        pass  # read-only or full $HOME, the cache is only an optimisation
 
 
 def last_state() -> WorkState:
     """Return the last work state from the work log."""
     length = WORKLOG.stat().st_size
-    # Rather than the deque approach, which reads the whole file, seek plus list caps
-    # the amount of data read to 10,000 bytes.  Seeking only skips data in binary mode,
-    # in text mode it needs to read the whole file to account for multi-byte characters.
-    has_tags = False
-    with WORKLOG.open("rb") as in_file:
-        in_file.seek(max(0, length - 10_000))
-        lines = list(in_file)
-        last_time = None
-        for from_end, line in enumerate(reversed(lines)):
-            try:
-                line = line.decode("utf8")
-            except UnicodeDecodeError:
-                continue  # 10,000 bytes may have split a multi-byte character.
-            if line.startswith("tags:"):
-                has_tags = True
-            last_time = TIME_REGEX.match(line)
-            if last_time:
-                break
-
-    if last_time:
-        return work_state(line, from_end, has_tags=has_tags)
+    if not length:
+        return WorkState()  # can't mmap an empty file
+    # Search the last 10,000 bytes of the memory mapped log backwards for line
+    # starts with rfind, so the scan happens in C, and match the timestamp on the
+    # raw bytes in place, so only the single matching line is decoded.
+    with WORKLOG.open("rb") as in_file, mmap.mmap(
+        in_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as log_map:
+        limit = max(0, length - 10_000)
+        end = length
+        from_end = 0
+        while end > limit:
+            start = log_map.rfind(b"\n", limit, end - 1) + 1 or limit
+            if TIME_REGEX_B.match(log_map, start):
+                # Any tags: line after the timestamp line, which ends at end - 1
+                has_tags = log_map.find(b"\ntags:", end - 1) != -1
+                line = log_map[start:end].decode("utf8", "replace")
+                return work_state(line, from_end, has_tags=has_tags)
+            end = start
+            from_end += 1
 
     return WorkState()
 
 
 def work_state(line: str, from_end: int = 0, has_tags=None) -> WorkState:
-    last_time = TIME_REGEX.match(line)
-    if not last_time:
+    # Cheap shape check first, most lines are tags / notes, not timestamps
+    if len(line) < 14 or line[8] != "-" or line[13] != " ":
+        return WorkState()
+    match = LINE_REGEX.match(line)
+    if not match:
         return WorkState()
-    time_str = last_time.group(0)
-    last = datetime.strptime(time_str.strip(), "%Y%m%d-%H%M")
-    git_str = GIT_REGEX.search(line)
-    git_str = git_str.group(0) if git_str else ""
-    cwd = line[len(time_str) : -len(git_str) - 1].strip()
+    year, month, day, hour, minute = match.groups()
+    line = line.rstrip("\n")
+    bracket = git_start(line) if line.endswith("]") else -1
+    git_str = line[bracket:] if bracket != -1 else ""
     return WorkState(
-        time=last, cwd=cwd, git_info=git_str, from_end=from_end, has_tags=has_tags
+        time=datetime(int(year), int(month), int(day), int(hour), int(minute)),
+        cwd=line[14 : len(line) - len(git_str)].strip(),
+        git_info=git_str,
+        from_end=from_end,
+        has_tags=has_tags,
     )
 
 
+def git_start(line: str) -> int:
+    """Return the index of the [ opening the git info that ends line, or -1.
+
+    That's the first " [" whose matching ] is the last character, so brackets in
+    the cwd before it, or nested in it (IPv6 remotes, [::1]), are handled.
+    """
+    pos = line.find(" [", 13)
+    while pos != -1:
+        segment = line[pos + 1 :]
+        if segment.count("[") == 1 and segment.count("]") == 1:
+            return pos + 1  # the usual case, no brackets inside
+        depth = 0
+        for end, char in enumerate(segment):
+            if char == "[":
+                depth += 1
+            elif char == "]":
+                depth -= 1
+                if not depth:
+                    break
+        if not depth and end == len(segment) - 1:
+            return pos + 1
+        pos = line.find(" [", pos + 1)
+    return -1
+
+
+def open_log_sequential() -> TextIO:
+    """Open the work log for a full front to back read.
+
+    Uses a 64 KB buffer, and tells the kernel the access is sequential so it
+    reads ahead more aggressively when the log isn't in the page cache.
+    """
+    log_file = WORKLOG.open(buffering=1 << 16)
+    if hasattr(os, "posix_fadvise"):  # not on macOS / Windows
+        os.posix_fadvise(log_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return log_file
+
+
 def tags():
     """Open the work log in vim, with the cursor at the end of the tags line."""
     # See if the last entry has tags, add tags: line if not
@@ -213,19 +358,45 @@ def tags():
     subprocess.run(" ".join(cmd), shell=True)
 
     # Tell the user about any new (previously unused) tags
-    tags = set()
-    last_tags = set()
-    with WORKLOG.open() as log_file:
-        for line in log_file:
-            if line.startswith("tags:"):
-                if last_tags:
-                    tags.update(last_tags)
-                    last_tags.clear()
-                last_tags = set(line[5:].strip().split())
-    new_tags = last_tags - tags
+    if TAGSFILE.exists():
+        tags = set(TAGSFILE.read_text().split())
+        new_tags = last_tags() - tags
+    else:  # first use, collect tags from the whole log
+        tags = set()
+        new_tags = set()
+        with open_log_sequential() as log_file:
+            for line in log_file:
+                if line.startswith("tags:"):
+                    tags.update(new_tags)
+                    new_tags = set(line[5:].strip().split())
+        new_tags -= tags
     if new_tags:
         print("Previous tags: ", ", ".join(tags))
         print("New tags: ", ", ".join(new_tags))
+    if new_tags or not TAGSFILE.exists():
+        tmp = TAGSFILE.with_name(f"{TAGSFILE.name}.{os.getpid()}")
+        try:
+            tmp.write_text("".join(f"{tag}\n" for tag in sorted(tags | new_tags)))
+            os.replace(tmp, TAGSFILE)
+        except OSError:
+            pass  # read-only or full $HOME, next run falls back to a full scan
+
+
+def last_tags() -> set[str]:
+    """Return the tags on the last tags: line in the tail of the work log."""
+    length = WORKLOG.stat().st_size
+    if not length:
+        return set()  # can't mmap an empty file
+    with WORKLOG.open("rb") as in_file, mmap.mmap(
+        in_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as log_map:
+        limit = max(0, length - 10_000)
+        start = log_map.rfind(b"\ntags:", limit) + 1
+        if not start and not (limit == 0 and log_map[:5] == b"tags:"):
+            return set()
+        end = log_map.find(b"\n", start)
+        line = log_map[start + 5 : end if end != -1 else length]
+        return set(line.decode("utf8", "replace").split())
 
 
 def json_str(work: dict) -> str:
@@ -237,6 +408,30 @@ def json_str(work: dict) -> str:
     return json.dumps(work, indent=2, sort_keys=True)
 
 
+def log_entries() -> Iterator[tuple[WorkState, list[str]]]:
+    """Yield (WorkState, lines) for each entry in the work log, in one pass.
+
+    lines starts with the entry's timestamp line, followed by the tags / notes
+    lines up to the next timestamp.  Lines before the first timestamp are
+    yielded with an empty WorkState().  Timestamp lines are located with one
+    multi-line regex scan of the whole log, rather than testing every line in
+    Python.
+    """
+    with open_log_sequential() as log_file:
+        text = log_file.read()
+    starts = [match.start() for match in ENTRY_REGEX.finditer(text)]
+    if not starts or starts[0]:
+        starts.insert(0, 0)
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        lines = text[start:end].split("\n")
+        last = lines.pop()  # "" unless the log doesn't end with a newline
+        lines = [line + "\n" for line in lines]
+        if last:
+            lines.append(last)
+        if lines:
+            yield work_state(lines[0]), lines
+
+
 def lw_json():
     """Dump the work log as JSON."""
     blank = lambda: {
@@ -248,78 +443,94 @@ def lw_json():
         "tags": set(),
     }
     current = blank()
-    with WORKLOG.open() as log_file:
-        for line in log_file:
-            work = work_state(line)
-            if not work.time:
-                if line.startswith("tags:"):
-                    current["tags"].update(line[5:].strip().split())
-                continue
-            if current["date"] != work.time.date().strftime("%a %b %d %Y"):
-                if current["date"]:
-                    print(json_str(current))
-                current = blank()
-                current["date"] = work.time.date().strftime("%a %b %d %Y")
-                current["start"] = work.time
-            current["end"] = work.time
-            current["hits"] += 1
+    day = None
+    for work, lines in log_entries():
+        if not work.time:
+            continue
+        if day != work.time.date():
+            if current["date"]:
+                print(json_str(current))
+            current = blank()
+            day = work.time.date()
+            current["date"] = day.strftime("%a %b %d %Y")
+            current["start"] = work.time
+        current["end"] = work.time
+        current["hits"] += 1
+        for line in lines:
+            if line.startswith("tags:"):
+                current["tags"].update(line[5:].strip().split())
     print(json_str(current))
 
 
+@lru_cache(maxsize=4096)
+def path_bucket(cwd: str) -> Optional[str]:
+    """Return the first folder under .../repo/ for cwd, or None if not in a repo.
+
+    Cached as the log repeats the same few folders many times.
+    """
+    path = Path(cwd)
+    if path.exists():
+        path = path.resolve()
+    parts = list(path.parts)
+    while parts and parts[0] != "repo":
+        del parts[0]
+    if not parts:
+        return None
+    return "/".join(parts[1:2])
+
+
 def lw_percent():
     """Show percent by path"""
-    total = 0
-    count = defaultdict(int)
-    with WORKLOG.open() as log_file:
-        for line in log_file:
-            work = work_state(line)
-            if not work.time or not work.cwd:
-                continue
-            path = Path(work.cwd)
-            if Path(path).exists():
-                path = path.resolve()
-            path = list(path.parts)
-            while path and path[0] != "repo":
-                del path[0]
-            if path:
-                del path[0]
-                total += 1
-                count["/".join(path[:1])] += 1
+    cwds = (work.cwd for work, _ in log_entries() if work.time and work.cwd)
+    count = Counter(bucket for bucket in map(path_bucket, cwds) if bucket is not None)
+    total = sum(count.values())
     for folder, hits in count.items():
         print(f"{folder}: {hits} {hits/total*100:.2f}")
 
 
 def lw_history():
     """Show history for this folder."""
-    last = last_state()
-    if not last.time:
+    if not last_state().time:
         print("No previous work log entry found.")
         return
-    printing = False
-    timestamp = ""
+    # The cwd, not the last entry's, which may have been logged by another shell
+    cwd = str(Path.cwd().resolve())
+    # Read the log once, each level up just filters this in memory
+    entries = [
+        (state, lines)
+        for state, lines in log_entries()
+        if state.time and len(lines) > 1
+    ]
     for up_one in range(5):
         output = False
-        with WORKLOG.open() as in_file:
-            for line in in_file:
-                state = work_state(line, 0, has_tags=None)
-                if state.time:
-                    printing = state.cwd == last.cwd
-                if printing:
-                    if state.time:
-                        timestamp = f"{RED}# {line.strip()}{DEFAULT}"
-                        if up_one:
-                            timestamp = (
-                                timestamp.strip()
-                                + f"{YELLOW} {up_one} LEVEL UP{DEFAULT}"
-                            )
-                        timestamp += "\n"
-                    else:
-                        print(f"{timestamp}{line}", end="")
-                        output = True
-                        timestamp = ""
+        for state, lines in entries:
+            if state.cwd != cwd:
+                continue
+            timestamp = f"{RED}# {lines[0].strip()}{DEFAULT}"
+            if up_one:
+                timestamp = timestamp.strip() + f"{YELLOW} {up_one} LEVEL UP{DEFAULT}"
+            print(timestamp, "".join(lines[1:]), sep="\n", end="")
+            output = True
         if output:
             break
-        last.cwd = os.path.dirname(last.cwd)
+        cwd = os.path.dirname(cwd)
+
+
+def show_tail(lines: int = 25) -> None:
+    """Print the last lines of the work log, like `tail -25` without the processes."""
+    length = WORKLOG.stat().st_size
+    if not length:
+        return  # can't mmap an empty file
+    with WORKLOG.open("rb") as in_file, mmap.mmap(
+        in_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as log_map:
+        start = length - 1 if log_map[-1] == ord("\n") else length
+        for _ in range(lines):
+            start = log_map.rfind(b"\n", 0, start)
+            if start == -1:
+                break
+        sys.stdout.buffer.write(log_map[start + 1 :])
+    sys.stdout.flush()
 
 
 def handle_command():
@@ -335,33 +546,38 @@ def handle_command():
         return  # PS1 mode pass through
     else:
         # Append command line text to the work log
-        with WORKLOG.open("a") as log_file:
-            log_file.write(" ".join(args))
-            log_file.write("\n")
+        with WORKLOG.open("ab") as log_file:
+            log_file.write(f"{' '.join(args)}\n".encode("utf8"))
 
     sys.exit()
 
 
 if __name__ == "__main__":
+    if COMMANDS.get((sys.argv[1:] or ["SHOW_TAIL"])[0], {}).get("read_only"):
+        handle_command()  # exits
+
     # Update log *before* handling command
     last = last_state()
     # print(last)
-    if last.time:
-        seconds = (datetime.now() - last.time).total_seconds()
+    seconds = (datetime.now() - last.time).total_seconds() if last.time else 0
     git_parts = git_info()
-    realpath = Path.cwd().resolve()
+    # Only resolve() (realpath() syscalls) when the cwd differs from the last entry
+    cwd = os.getcwd()
+    realpath = cwd if cwd == last.cwd else str(Path(cwd).resolve())
     if (
         not last.time
         or seconds >= INTERVAL * 60
         # e.g. in a container, realpath is /home/auser, but in host /users/usr4/auser
         # so host won't generate new entry just because container logged on under
         # /home/auser
-        or Path(last.cwd).resolve() != realpath
+        or (realpath != last.cwd and str(Path(last.cwd).resolve()) != realpath)
         or last.git_info != str(git_parts)
     ):
-        with WORKLOG.open("a") as log_file:
-            log_file.write(datetime.now().strftime("%Y%m%d-%H%M"))
-            log_file.write(f" {realpath} {git_parts}\n")
+        # One write() call, so a concurrent last_state() never sees half an entry
+        with WORKLOG.open("ab") as log_file:
+            log_file.write(
+                f"{datetime.now():%Y%m%d-%H%M} {realpath} {git_parts}\n".encode("utf8")
+            )
         if seconds >= INTERVAL * 60:
             print(f"\n\n{INTERVAL}+ minutes since last work log entry ", end="")
         # So prompt isn't out of date, but not zero so prompt isn't INTERVAL+1
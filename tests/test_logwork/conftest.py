@@ -0,0 +1,15 @@
+"""Fixtures for logwork tests."""
+import importlib
+
+import pytest
+
+import logwork.logwork
+
+
+@pytest.fixture
+def lw(tmp_path, monkeypatch):
+    """logwork.logwork reloaded with HOME, and so the work log, in tmp_path."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    module = importlib.reload(logwork.logwork)
+    monkeypatch.setattr(module.subprocess, "run", lambda *args, **kwargs: None)
+    return module
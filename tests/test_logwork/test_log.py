@@ -0,0 +1,105 @@
+"""Tests for reading the work log."""
+from datetime import datetime
+
+import pytest
+
+NUMBERS = b"".join(b"%d\n" % i for i in range(40))
+
+
+@pytest.mark.parametrize(
+    ("log", "expected"),
+    [
+        ("", []),
+        (
+            "preamble\ntags: pre\n20230101-1200 /a [m]\ntags: x\n",
+            [
+                (None, ["preamble\n", "tags: pre\n"]),
+                ("/a", ["20230101-1200 /a [m]\n", "tags: x\n"]),
+            ],
+        ),
+        (
+            "20230101-1200 /a\n\nnote\n\n20230101-1300 /b",
+            [
+                ("/a", ["20230101-1200 /a\n", "\n", "note\n", "\n"]),
+                ("/b", ["20230101-1300 /b"]),
+            ],
+        ),
+        (
+            "20230101-1200 /a\nnot a stamp 20230101-1300 /b\n",
+            [("/a", ["20230101-1200 /a\n", "not a stamp 20230101-1300 /b\n"])],
+        ),
+    ],
+)
+def test_log_entries(lw, log, expected):
+    """Preamble, blank lines, and a last line without a newline."""
+    lw.WORKLOG.write_text(log)
+    assert [(work.cwd, lines) for work, lines in lw.log_entries()] == expected
+
+
+@pytest.mark.parametrize(
+    ("log", "expected"),
+    [
+        (b"", b""),
+        (b"a", b"a"),
+        (b"a\n", b"a\n"),
+        (b"\n\n\n", b"\n\n\n"),
+        (NUMBERS, b"".join(b"%d\n" % i for i in range(15, 40))),
+        (NUMBERS.rstrip(), b"".join(b"%d\n" % i for i in range(15, 40)).rstrip()),
+        (b"x" * 5000 + b"\n" + b"y\n" * 24, b"x" * 5000 + b"\n" + b"y\n" * 24),
+    ],
+)
+def test_show_tail(lw, capsysbinary, log, expected):
+    """Same output as `tail -25`, with or without a trailing newline."""
+    lw.WORKLOG.write_bytes(log)
+    lw.show_tail()
+    assert capsysbinary.readouterr().out == expected
+
+
+@pytest.mark.parametrize(
+    ("line", "cwd", "git_info"),
+    [
+        ("20230101-1200 /a\n", "/a", ""),
+        ("20230101-1200 /a [main ! gh.com/x abc]\n", "/a", "[main ! gh.com/x abc]"),
+        ("20230101-1200 /a [b]/c [m gh.com/x abc]\n", "/a [b]/c", "[m gh.com/x abc]"),
+        ("20230101-1200 /w [main [::1]:80/x abc]\n", "/w", "[main [::1]:80/x abc]"),
+        ("20230101-1200 /a [b] [m [::1]/x abc]", "/a [b]", "[m [::1]/x abc]"),
+        ("20230101-1200 [main  abc]\n", "", "[main  abc]"),
+        ("20230101-1200 /a]\n", "/a]", ""),
+    ],
+)
+def test_work_state(lw, line, cwd, git_info):
+    """Brackets in the cwd or in the origin don't confuse the git info."""
+    work = lw.work_state(line)
+    assert work.time == datetime(2023, 1, 1, 12)
+    assert (work.cwd, work.git_info) == (cwd, git_info)
+
+
+STAMP = "20230101-1200 /a [m]\n"
+
+
+@pytest.mark.parametrize(
+    ("log", "cwd", "from_end", "has_tags"),
+    [
+        ("", None, None, None),
+        ("no stamps\n", None, None, None),
+        ("20230101-1200 /a [m]", "/a", 0, False),
+        (STAMP, "/a", 0, False),
+        (STAMP + "\n\n", "/a", 2, False),
+        (STAMP + "tags: x\nnote\n", "/a", 2, True),
+        (STAMP + "note tags: x\n", "/a", 1, False),
+        ("tags: x\n" + STAMP, "/a", 0, False),
+        ("20230101-1000 /b\n" + STAMP + "note\n", "/a", 1, False),
+        (STAMP + "x" * 10_000 + "\n", None, None, None),
+        ("x" * 10_000 + "\n" + STAMP + "tags: x", "/a", 1, True),
+    ],
+)
+def test_last_state(lw, log, cwd, from_end, has_tags):
+    """Last timestamp in the final 10,000 bytes, lines after it, and tags."""
+    lw.WORKLOG.write_text(log)
+    work = lw.last_state()
+    assert (work.cwd, work.from_end, work.has_tags) == (cwd, from_end, has_tags)
+    if cwd:
+        assert work.time == datetime(2023, 1, 1, 12)
+        assert work.git_info == "[m]"
+    else:
+        assert (work.time, work.git_info) == (None, None)
@@ -0,0 +1,53 @@
+"""Tests for the tags sidecar file used by `lw t`."""
+import pytest
+
+
+def test_tags_first_run(lw, capsys):
+    """Without a sidecar, tags are collected from the whole log."""
+    lw.WORKLOG.write_text(
+        "20230101-1200 /a\ntags: a b\n20230101-1300 /a\ntags: b c\nnote\n"
+    )
+    lw.tags()
+    assert "New tags:  c" in capsys.readouterr().out
+    assert lw.TAGSFILE.read_text() == "a\nb\nc\n"
+
+
+def test_tags_rerun(lw, capsys):
+    """Tags already in the sidecar aren't reported again, new ones are added."""
+    lw.WORKLOG.write_text("20230101-1200 /a\ntags: a b\n")
+    lw.tags()
+    capsys.readouterr()
+    lw.tags()
+    assert capsys.readouterr().out == ""
+
+    with lw.WORKLOG.open("a") as log_file:
+        log_file.write("20230101-1300 /a\ntags: b d\n")
+    lw.tags()
+    assert "New tags:  d" in capsys.readouterr().out
+    assert lw.TAGSFILE.read_text() == "a\nb\nd\n"
+
+
+@pytest.mark.parametrize(
+    ("log", "expected"),
+    [
+        ("tags: zz\nnote\n", {"zz"}),
+        ("tags: zz", {"zz"}),
+        ("20230101-1200 /a\ntags: x y", {"x", "y"}),
+        ("20230101-1200 /a\ntags: x\n20230101-1300 /a\ntags: y\n", {"y"}),
+        ("20230101-1200 /a\nnote tags: x\n", set()),
+        ("", set()),
+    ],
+)
+def test_last_tags(lw, log, expected):
+    """The last tags: line, including one at offset 0 or without a newline."""
+    lw.WORKLOG.write_text(log)
+    assert lw.last_tags() == expected
+
+
+def test_tags_unwritable(lw, tmp_path, monkeypatch, capsys):
+    """Failing to write the sidecar is ignored."""
+    monkeypatch.setattr(lw, "TAGSFILE", tmp_path / "missing" / ".worklog.tags")
+    lw.WORKLOG.write_text("20230101-1200 /a\ntags: a\n20230101-1300 /a\ntags: b\n")
+    lw.tags()
+    assert "New tags:  b" in capsys.readouterr().out
+    assert not lw.TAGSFILE.exists()